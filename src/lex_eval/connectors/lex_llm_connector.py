@@ -3,12 +3,18 @@ Connector for communicating with the lex-llm API service.
 This allows lex-eval to run workflows .
 """
 
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 import httpx
 import os
-import json
+import time
 from pydantic import BaseModel
 
+try:
+    # orjson is much faster on the many small per-token events and reads bytes directly
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover - optional speedup
+    from json import loads as json_loads  # type: ignore[assignment]
+
 
 # Models matching lex-llm's response format
 class Source(BaseModel):
@@ -46,16 +52,50 @@ class WorkflowMetadata(BaseModel):
 class LexLLMConnector:
     """Handles communication with the lex-llm service."""
 
-    def __init__(self, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        metadata_ttl: float = 60.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
         """
         Initialize the connector.
         
         Args:
             base_url: The base URL of the lex-llm service. 
                     Defaults to LEX_LLM_HOST env var or http://localhost:8001
+            metadata_ttl: Seconds to reuse fetched workflow metadata before
+                    requesting it again
+            transport: Optional httpx transport for the underlying client,
+                    e.g. httpx.MockTransport in tests
         """
-        self.base_url = base_url or os.getenv("LEX_LLM_HOST", "http://localhost:8001")
+        self.base_url = base_url or os.environ.get("LEX_LLM_HOST", "http://localhost:8001")
         self.timeout = httpx.Timeout(300.0, connect=10.0)  # 5 min for long workflows
+        # One pooled client per connector so repeated calls reuse the TCP/TLS session
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=60,
+            ),
+            http2=True,
+            transport=transport,
+        )
+        # workflow_id -> (fetched at, metadata); workflow metadata rarely changes
+        self._metadata_cache: Dict[str, Tuple[float, WorkflowMetadata]] = {}
+        self._metadata_ttl = metadata_ttl
+    
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client and its connection pool."""
+        await self._client.aclose()
+    
+    async def __aenter__(self) -> "LexLLMConnector":
+        return self
+    
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
     
     async def run_workflow(
         self,
@@ -67,6 +107,16 @@ class LexLLMConnector:
         """
         Run a workflow and return the complete result.
         
+        The response is an NDJSON stream with events like:
+        - stream_start
+        - workflow_step
+        - sources (contains retrieved documents)
+        - text_chunk (streaming response)
+        - stream_end (contains final conversation_history)
+        
+        Events are parsed line by line as they arrive, so the full body is
+        never buffered. Lines after stream_end are read but not parsed.
+        
         Args:
             workflow_id: ID of the workflow to run (e.g., "beta_workflow_v2_hyde")
             user_input: The user's query/input
@@ -77,102 +127,131 @@ class LexLLMConnector:
             WorkflowResult containing response, sources, and updated history
             
         Example:
-            >>> connector = LexLLMConnector()
-            >>> result = await connector.run_workflow(
-            ...     workflow_id="beta_workflow_v2_hyde",
-            ...     user_input="What is sne?",
-            ...     conversation_id="eval-123"
-            ... )
+            >>> async with LexLLMConnector() as connector:
+            ...     result = await connector.run_workflow(
+            ...         workflow_id="beta_workflow_v2_hyde",
+            ...         user_input="What is sne?",
+            ...         conversation_id="eval-123"
+            ...     )
             >>> print(result.response)
             >>> print(result.sources)
         """
+        response_chunks: List[str] = []
+        append_chunk = response_chunks.append
+        sources: List[Dict[str, Any]] = []
+        updated_history: List[Dict[str, str]] = []
+        result_conversation_id = ""
+        run_id = ""
+        
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/workflows/{workflow_id}/run",
-                    json={
-                        "user_input": user_input,
-                        "conversation_id": conversation_id,
-                        "conversation_history": conversation_history or [],
-                    },
-                )
+            async with self._client.stream(
+                "POST",
+                f"/workflows/{workflow_id}/run",
+                json={
+                    "user_input": user_input,
+                    "conversation_id": conversation_id,
+                    "conversation_history": conversation_history or [],
+                },
+            ) as response:
+                if response.is_error:
+                    # Read the body so the error message below can include it
+                    await response.aread()
                 response.raise_for_status()
                 
-                # Parse NDJSON streaming response
-                result_data = self._parse_ndjson_stream(response.text)
-                return WorkflowResult(**result_data)
+                done = False
+                async for line in self._iter_ndjson_lines(response):
+                    if done:
+                        # Drain anything after stream_end without parsing it, so the
+                        # connection is fully read and can return to the pool
+                        continue
+                    event = json_loads(line)
+                    event_type = event.get("event")
+                    
+                    # text_chunk is by far the most frequent event, so test it first
+                    if event_type == "text_chunk":
+                        # Accumulate response text
+                        append_chunk(event.get("data", ""))
+                    
+                    elif event_type == "sources":
+                        # Extract sources from the event
+                        sources = event.get("data", [])
+                    
+                    elif event_type == "stream_start":
+                        result_conversation_id = event.get("conversation_id", "")
+                        run_id = event.get("run_id", "")
+                    
+                    elif event_type == "stream_end":
+                        # Get final conversation history
+                        updated_history = event.get("data", {}).get("conversation_history", [])
+                        done = True
+                
+                return WorkflowResult.model_validate({
+                    "conversation_id": result_conversation_id,
+                    "run_id": run_id,
+                    "response": "".join(response_chunks),
+                    "sources": sources,
+                    "conversation_history": updated_history,
+                })
                 
         except httpx.RequestError as e:
             raise ConnectionError(f"Failed to connect to lex-llm at {self.base_url}: {e}")
         except httpx.HTTPStatusError as e:
             raise RuntimeError(f"Workflow execution failed: {e.response.text}")
     
-    def _parse_ndjson_stream(self, ndjson_text: str) -> Dict[str, Any]:
+    @staticmethod
+    async def _iter_ndjson_lines(response: httpx.Response) -> AsyncIterator[bytes]:
         """
-        Parse NDJSON stream and extract the final result.
+        Yield non-empty NDJSON lines from a streamed response as raw bytes.
         
-        The stream contains events like:
-        - stream_start
-        - workflow_step
-        - sources (contains retrieved documents)
-        - text_chunk (streaming response)
-        - stream_end (contains final conversation_history)
+        Splitting on newlines ourselves skips httpx's per-line text decoding;
+        the JSON parser accepts UTF-8 bytes directly.
         """
-        response_chunks = []
-        sources = []
-        conversation_history = []
-        conversation_id = ""
-        run_id = ""
-        
-        for line in ndjson_text.strip().split('\n'):
-            if not line:
-                continue
-                
-            event = json.loads(line)
-            event_type = event.get("event")
-            
-            if event_type == "stream_start":
-                conversation_id = event.get("conversation_id", "")
-                run_id = event.get("run_id", "")
-            
-            elif event_type == "sources":
-                # Extract sources from the event
-                sources = event.get("data", [])
-            
-            elif event_type == "text_chunk":
-                # Accumulate response text
-                chunk = event.get("data", "")
-                response_chunks.append(chunk)
-            
-            elif event_type == "stream_end":
-                # Get final conversation history
-                conversation_history = event.get("data", {}).get("conversation_history", [])
-        
-        return {
-            "conversation_id": conversation_id,
-            "run_id": run_id,
-            "response": "".join(response_chunks),
-            "sources": sources,
-            "conversation_history": conversation_history,
-        }
+        buffer = bytearray()
+        async for chunk in response.aiter_bytes():
+            # Only the newly received bytes can contain the next newline, so a
+            # line spread over many chunks isn't rescanned on every chunk
+            search_from = len(buffer)
+            buffer += chunk
+            line_start = 0
+            newline = buffer.find(b"\n", search_from)
+            while newline != -1:
+                line = bytes(buffer[line_start:newline])
+                if line.strip():
+                    yield line
+                line_start = newline + 1
+                newline = buffer.find(b"\n", line_start)
+            if line_start:
+                del buffer[:line_start]
+        if buffer.strip():
+            yield bytes(buffer)
+    
+    def invalidate_metadata_cache(self) -> None:
+        """Drop all cached workflow metadata so the next lookups hit the API."""
+        self._metadata_cache.clear()
     
     async def get_workflow_metadata(self, workflow_id: str) -> WorkflowMetadata:
         """
         Get metadata about a specific workflow.
         
+        Results are cached for metadata_ttl seconds, and list_workflows()
+        warms the cache for every workflow it returns.
+        
         Args:
             workflow_id: ID of the workflow
             
         Returns:
             WorkflowMetadata containing workflow information
         """
+        entry = self._metadata_cache.get(workflow_id)
+        if entry and time.monotonic() - entry[0] < self._metadata_ttl:
+            return entry[1]
+        
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/workflows/{workflow_id}/metadata"
-                )
-                response.raise_for_status()
-                return WorkflowMetadata(**response.json())
+            response = await self._client.get(f"/workflows/{workflow_id}/metadata")
+            response.raise_for_status()
+            metadata = WorkflowMetadata(**response.json())
+            self._metadata_cache[workflow_id] = (time.monotonic(), metadata)
+            return metadata
                 
         except httpx.RequestError as e:
             raise ConnectionError(f"Failed to connect to lex-llm at {self.base_url}: {e}")
@@ -185,12 +264,15 @@ class LexLLMConnector:
             List of WorkflowMetadata for all available workflows
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(f"{self.base_url}/workflows/metadata")
-                response.raise_for_status()
-                
-                workflows_data = response.json()
-                return [WorkflowMetadata(**wf) for wf in workflows_data]
+            response = await self._client.get("/workflows/metadata")
+            response.raise_for_status()
+            
+            workflows_data = response.json()
+            workflows = [WorkflowMetadata(**wf) for wf in workflows_data]
+            fetched_at = time.monotonic()
+            for metadata in workflows:
+                self._metadata_cache[metadata.workflow_id] = (fetched_at, metadata)
+            return workflows
                 
         except httpx.RequestError as e:
             raise ConnectionError(f"Failed to connect to lex-llm at {self.base_url}: {e}")
@@ -203,8 +285,7 @@ class LexLLMConnector:
             True if service is healthy, False otherwise
         """
         try:
-            async with httpx.AsyncClient(timeout=httpx.Timeout(5.0)) as client:
-                response = await client.get(f"{self.base_url}/health")
-                return response.status_code == 200
+            response = await self._client.get("/health", timeout=httpx.Timeout(5.0))
+            return response.status_code == 200
         except:
             return False
\ No newline at end of file
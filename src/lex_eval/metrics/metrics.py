@@ -3,11 +3,58 @@ Reference-free evaluation metrics for RAG systems.
 These metrics don't require ground truth labels.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Protocol, Sequence, Set, Tuple, Union
 from pydantic import BaseModel
 import re
 
 
+class SourceModel(Protocol):
+    """Any source object with a title that can be dumped to a dict, e.g. the connector's Source."""
+    title: str
+    
+    def model_dump(self) -> Dict[str, Any]: ...
+
+
+# Sources can be passed as plain dicts or directly as Source models
+SourceLike = Union[Dict[str, Any], SourceModel]
+
+
+# Patterns are compiled once at import time and shared by all metric calls
+_WORD_RE = re.compile(r'\w+')
+# Citation markers: [source], "ifølge" (according to), "artikel" (article), "kilde" (source)
+_CITATION_RE = re.compile(r'\[.*?\]|ifølge|artikel|kilde')
+# Simple heuristic: sentences with "er", "har", "blev" etc. are claims
+_CLAIM_RE = re.compile(r'\b(er|var|har|havde|blev|bliver|kan|skal|vil)\b')
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+
+
+def _title(source: SourceLike) -> str:
+    """Return the title of a source given as a dict or a Source model."""
+    if isinstance(source, dict):
+        return source.get('title') or ''
+    return source.title
+
+
+def _scan_titles(sources: Sequence[SourceLike]) -> Tuple[Set[str], int, int]:
+    """
+    Tokenize all source titles in a single pass.
+    
+    Returns:
+        The distinct lowercase title words, the summed title length and
+        the total number of title words
+    """
+    source_words: Set[str] = set()
+    length_sum = 0
+    total_words = 0
+    for source in sources:
+        title = _title(source)
+        length_sum += len(title)
+        words = _WORD_RE.findall(title.lower())
+        total_words += len(words)
+        source_words.update(words)
+    return source_words, length_sum, total_words
+
+
 class RetrievalMetrics(BaseModel):
     """Metrics for evaluating retrieval quality."""
     num_sources: int  # Number of sources retrieved
@@ -44,17 +91,66 @@ class MetricsCalculator:
     """Calculate reference-free metrics for RAG evaluation."""
     
     @staticmethod
-    def calculate_retrieval_metrics(sources: List[Dict[str, Any]]) -> RetrievalMetrics:
+    def calculate_retrieval_metrics(sources: Sequence[SourceLike]) -> RetrievalMetrics:
         """
         Calculate metrics about the retrieved sources.
         
         Args:
-            sources: List of source documents with 'title', 'url', etc.
+            sources: List of source documents (dicts or Source models) with 'title', 'url', etc.
             
         Returns:
             RetrievalMetrics
         """
-        if not sources:
+        source_words, length_sum, total_words = _scan_titles(sources)
+        return MetricsCalculator._retrieval_metrics(
+            len(sources), source_words, length_sum, total_words
+        )
+    
+    @staticmethod
+    def calculate_answer_metrics(
+        response: str, 
+        sources: Sequence[SourceLike]
+    ) -> AnswerMetrics:
+        """
+        Calculate metrics about the generated answer.
+        
+        Args:
+            response: The generated answer text
+            sources: List of source documents
+            
+        Returns:
+            AnswerMetrics
+        """
+        source_words, _, _ = _scan_titles(sources)
+        return MetricsCalculator._answer_metrics(response, response.lower(), source_words)
+    
+    @staticmethod
+    def calculate_faithfulness_metrics(
+        response: str,
+        sources: Sequence[SourceLike]
+    ) -> FaithfulnessMetrics:
+        """
+        Calculate faithfulness metrics.
+        
+        Args:
+            response: The generated answer
+            sources: List of source documents
+            
+        Returns:
+            FaithfulnessMetrics
+        """
+        return MetricsCalculator._faithfulness_metrics(response.lower())
+    
+    # The private variants take the lowercased response and the scanned source
+    # titles, so evaluate_response only computes them once for all metrics
+    @staticmethod
+    def _retrieval_metrics(
+        num_sources: int,
+        source_words: Set[str],
+        length_sum: int,
+        total_words: int
+    ) -> RetrievalMetrics:
+        if not num_sources:
             return RetrievalMetrics(
                 num_sources=0,
                 avg_source_length=0.0,
@@ -62,53 +158,28 @@ class MetricsCalculator:
             )
         
         # Calculate average source title length (proxy for document size)
-        avg_length = sum(len(s.get('title', '')) for s in sources) / len(sources)
+        avg_length = length_sum / num_sources
         
         # Calculate diversity: ratio of unique words to total words in titles
-        all_titles = ' '.join(s.get('title', '') for s in sources).lower()
-        words = re.findall(r'\w+', all_titles)
-        unique_words = set(words)
-        diversity = len(unique_words) / len(words) if words else 0.0
+        diversity = len(source_words) / total_words if total_words else 0.0
         
         return RetrievalMetrics(
-            num_sources=len(sources),
+            num_sources=num_sources,
             avg_source_length=avg_length,
             source_diversity=diversity
         )
     
     @staticmethod
-    def calculate_answer_metrics(
-        response: str, 
-        sources: List[Dict[str, Any]]
+    def _answer_metrics(
+        response: str,
+        response_lower: str,
+        source_words: Set[str]
     ) -> AnswerMetrics:
-        """
-        Calculate metrics about the generated answer.
-        
-        Args:
-            response: The generated answer text
-            sources: List of source documents
-            
-        Returns:
-            AnswerMetrics
-        """
         # Count citations (look for patterns like "artikel", "ifølge", etc.)
-        citation_patterns = [
-            r'\[.*?\]',  # [source]
-            r'ifølge',   # "according to" in Danish
-            r'artikel',  # "article"
-            r'kilde',    # "source"
-        ]
-        citation_count = sum(
-            len(re.findall(pattern, response.lower())) 
-            for pattern in citation_patterns
-        )
+        citation_count = len(_CITATION_RE.findall(response_lower))
         
         # Calculate overlap between answer and source titles
-        response_words = set(re.findall(r'\w+', response.lower()))
-        source_words = set()
-        for source in sources:
-            title_words = re.findall(r'\w+', source.get('title', '').lower())
-            source_words.update(title_words)
+        response_words = set(_WORD_RE.findall(response_lower))
         
         if response_words and source_words:
             overlap = len(response_words & source_words) / len(response_words)
@@ -122,30 +193,15 @@ class MetricsCalculator:
         )
     
     @staticmethod
-    def calculate_faithfulness_metrics(
-        response: str,
-        sources: List[Dict[str, Any]]
-    ) -> FaithfulnessMetrics:
-        """
-        Calculate faithfulness metrics.
-        
-        Args:
-            response: The generated answer
-            sources: List of source documents
-            
-        Returns:
-            FaithfulnessMetrics
-        """
+    def _faithfulness_metrics(response_lower: str) -> FaithfulnessMetrics:
         # Check if answer has any citations
-        has_citations = bool(re.search(r'\[.*?\]|ifølge|artikel|kilde', response.lower()))
+        has_citations = bool(_CITATION_RE.search(response_lower))
         
         # Count claims (sentences that contain verbs - rough proxy)
-        sentences = re.split(r'[.!?]+', response)
-        # Simple heuristic: sentences with "er", "har", "blev" etc. are claims
-        claim_patterns = r'\b(er|var|har|havde|blev|bliver|kan|skal|vil)\b'
+        sentences = _SENTENCE_SPLIT_RE.split(response_lower)
         claims_count = sum(
             1 for sent in sentences 
-            if re.search(claim_patterns, sent.lower())
+            if _CLAIM_RE.search(sent)
         )
         
         return FaithfulnessMetrics(
@@ -159,7 +215,7 @@ class MetricsCalculator:
         query: str,
         workflow_id: str,
         response: str,
-        sources: List[Dict[str, Any]]
+        sources: Sequence[SourceLike]
     ) -> EvaluationResult:
         """
         Evaluate a complete RAG response.
@@ -183,14 +239,18 @@ class MetricsCalculator:
             >>> print(f"Retrieved {result.retrieval.num_sources} sources")
             >>> print(f"Answer length: {result.answer.answer_length}")
         """
+        response_lower = response.lower()
+        source_words, length_sum, total_words = _scan_titles(sources)
         return EvaluationResult(
             query=query,
             workflow_id=workflow_id,
-            retrieval=cls.calculate_retrieval_metrics(sources),
-            answer=cls.calculate_answer_metrics(response, sources),
-            faithfulness=cls.calculate_faithfulness_metrics(response, sources),
+            retrieval=cls._retrieval_metrics(
+                len(sources), source_words, length_sum, total_words
+            ),
+            answer=cls._answer_metrics(response, response_lower, source_words),
+            faithfulness=cls._faithfulness_metrics(response_lower),
             response=response,
-            sources=sources
+            sources=[s if isinstance(s, dict) else s.model_dump() for s in sources]
         )
 
 
@@ -208,46 +268,79 @@ def compare_workflows(results: List[EvaluationResult]) -> Dict[str, Any]:
     if not results:
         return {}
     
+    # Accumulate every statistic in one pass over the results
+    n = len(results)
+    workflows = []
+    sum_sources = sum_diversity = 0.0
+    sum_length = sum_citations = sum_overlap = 0.0
+    sum_with_citations = sum_claims = 0.0
+    for r in results:
+        retrieval = r.retrieval
+        answer = r.answer
+        faithfulness = r.faithfulness
+        workflows.append(r.workflow_id)
+        sum_sources += retrieval.num_sources
+        sum_diversity += retrieval.source_diversity
+        sum_length += answer.answer_length
+        sum_citations += answer.citation_count
+        sum_overlap += answer.answer_source_overlap
+        sum_with_citations += faithfulness.has_citations
+        sum_claims += faithfulness.claims_count
+    
     comparison = {
-        "workflows": [r.workflow_id for r in results],
+        "workflows": workflows,
         "retrieval": {
-            "avg_sources": sum(r.retrieval.num_sources for r in results) / len(results),
-            "avg_diversity": sum(r.retrieval.source_diversity for r in results) / len(results),
+            "avg_sources": sum_sources / n,
+            "avg_diversity": sum_diversity / n,
         },
         "answer": {
-            "avg_length": sum(r.answer.answer_length for r in results) / len(results),
-            "avg_citations": sum(r.answer.citation_count for r in results) / len(results),
-            "avg_overlap": sum(r.answer.answer_source_overlap for r in results) / len(results),
+            "avg_length": sum_length / n,
+            "avg_citations": sum_citations / n,
+            "avg_overlap": sum_overlap / n,
         },
         "faithfulness": {
-            "pct_with_citations": sum(r.faithfulness.has_citations for r in results) / len(results) * 100,
-            "avg_claims": sum(r.faithfulness.claims_count for r in results) / len(results),
+            "pct_with_citations": sum_with_citations / n * 100,
+            "avg_claims": sum_claims / n,
         }
     }
     
     return comparison
 
 
-def print_evaluation_summary(result: EvaluationResult):
+def print_evaluation_summary(result: EvaluationResult) -> str:
+    """
+    Build a human-readable summary of evaluation results.
+    
+    The summary is returned rather than printed so callers running many
+    evaluations concurrently can emit all summaries at once; use
+    print_evaluation_summary_stdout to print it directly.
+    """
+    lines = [
+        f"\n{'='*60}",
+        f"Query: {result.query}",
+        f"Workflow: {result.workflow_id}",
+        f"{'='*60}",
+        
+        f"\n RETRIEVAL METRICS:",
+        f"  • Sources retrieved: {result.retrieval.num_sources}",
+        f"  • Source diversity: {result.retrieval.source_diversity:.2f}",
+        
+        f"\n ANSWER METRICS:",
+        f"  • Answer length: {result.answer.answer_length} chars",
+        f"  • Citations found: {result.answer.citation_count}",
+        f"  • Answer-source overlap: {result.answer.answer_source_overlap:.2%}",
+        
+        f"\n FAITHFULNESS METRICS:",
+        f"  • Has citations: {'Yes' if result.faithfulness.has_citations else 'No'}",
+        f"  • Claims made: {result.faithfulness.claims_count}",
+        
+        f"\n RESPONSE:",
+        f"  {result.response[:200]}...",
+        f"\n{'='*60}\n",
+    ]
+    return "\n".join(lines)
+
+
+def print_evaluation_summary_stdout(result: EvaluationResult) -> None:
     """Print a human-readable summary of evaluation results."""
-    print(f"\n{'='*60}")
-    print(f"Query: {result.query}")
-    print(f"Workflow: {result.workflow_id}")
-    print(f"{'='*60}")
-    
-    print(f"\n RETRIEVAL METRICS:")
-    print(f"  • Sources retrieved: {result.retrieval.num_sources}")
-    print(f"  • Source diversity: {result.retrieval.source_diversity:.2f}")
-    
-    print(f"\n ANSWER METRICS:")
-    print(f"  • Answer length: {result.answer.answer_length} chars")
-    print(f"  • Citations found: {result.answer.citation_count}")
-    print(f"  • Answer-source overlap: {result.answer.answer_source_overlap:.2%}")
-    
-    print(f"\n FAITHFULNESS METRICS:")
-    print(f"  • Has citations: {'Yes' if result.faithfulness.has_citations else 'No'}")
-    print(f"  • Claims made: {result.faithfulness.claims_count}")
-    
-    print(f"\n RESPONSE:")
-    print(f"  {result.response[:200]}...")
-    print(f"\n{'='*60}\n")
\ No newline at end of file
+    print(print_evaluation_summary(result))
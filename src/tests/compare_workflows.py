@@ -3,9 +3,25 @@ Compare multiple workflows on the same query.
 """
 
 import asyncio
+import sys
+from typing import AsyncGenerator, Tuple, Union
 from lex_eval.connectors.lex_llm_connector import LexLLMConnector
-from lex_eval.metrics.metrics import MetricsCalculator, print_evaluation_summary, compare_workflows
-import json
+from lex_eval.metrics.metrics import (
+    EvaluationResult,
+    MetricsCalculator,
+    print_evaluation_summary,
+    compare_workflows,
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+    import json
+
+
+# (query, workflow_id, evaluation result or the exception the run raised)
+BatchItem = Tuple[str, str, Union[EvaluationResult, Exception]]
 
 
 async def compare_workflows_on_query(
@@ -27,32 +43,43 @@ async def compare_workflows_on_query(
     
     results = []
     
-    for workflow_id in workflow_ids:
-        print(f"Running workflow: {workflow_id}...")
-        
-        try:
-            # Run workflow
-            workflow_result = await connector.run_workflow(
+    print(f"Running workflows: {', '.join(workflow_ids)}...")
+    
+    # Workflows are independent, so run them concurrently over the shared client
+    workflow_results = await asyncio.gather(
+        *(
+            connector.run_workflow(
                 workflow_id=workflow_id,
                 user_input=query,
                 conversation_id=f"compare-{workflow_id}"
             )
-            
+            for workflow_id in workflow_ids
+        ),
+        return_exceptions=True,
+    )
+    
+    for workflow_id, workflow_result in zip(workflow_ids, workflow_results):
+        if isinstance(workflow_result, BaseException):
+            print(f" Failed to run {workflow_id}: {workflow_result}\n")
+            continue
+        
+        try:
             # Calculate metrics
             eval_result = MetricsCalculator.evaluate_response(
                 query=query,
                 workflow_id=workflow_id,
                 response=workflow_result.response,
-                sources=[s.model_dump() for s in workflow_result.sources]
+                sources=workflow_result.sources
             )
-            
-            results.append(eval_result)
-            
-            # Print individual result
-            print_evaluation_summary(eval_result)
-            
         except Exception as e:
             print(f" Failed to run {workflow_id}: {e}\n")
+            continue
+        
+        results.append(eval_result)
+    
+    # Print individual results in one write, off the event loop
+    summaries = [print_evaluation_summary(r) for r in results]
+    await asyncio.to_thread(sys.stdout.write, "".join(f"{s}\n" for s in summaries))
     
     # Print comparison
     if len(results) > 1:
@@ -101,11 +128,83 @@ async def compare_workflows_on_query(
     return results
 
 
+async def evaluate_batch(
+    connector: LexLLMConnector,
+    queries: list[str],
+    workflow_ids: list[str],
+    max_concurrency: int = 16,
+) -> AsyncGenerator[BatchItem, None]:
+    """
+    Run every query on every workflow and yield results as they complete.
+    
+    At most max_concurrency workflow runs are in flight at once. Metrics are
+    computed as soon as each response lands, so results can be written out
+    incrementally (e.g. as JSONL) instead of being buffered. A failed run or
+    metrics calculation is yielded with its exception in place of the result,
+    leaving reporting to the caller.
+    
+    Args:
+        connector: LexLLMConnector instance
+        queries: The queries to evaluate
+        workflow_ids: List of workflow IDs to run each query on
+        max_concurrency: Maximum number of concurrent workflow runs
+        
+    Example:
+        >>> failures = []
+        >>> async with LexLLMConnector() as connector:
+        ...     with open("batch_results.jsonl", "w", encoding="utf-8") as f:
+        ...         async for query, workflow_id, result in evaluate_batch(
+        ...             connector, queries, workflows
+        ...         ):
+        ...             if isinstance(result, Exception):
+        ...                 failures.append((query, workflow_id, result))
+        ...             else:
+        ...                 f.write(result.model_dump_json() + "\\n")
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def evaluate_one(
+        query_index: int, query: str, workflow_id: str
+    ) -> BatchItem:
+        async with semaphore:
+            try:
+                workflow_result = await connector.run_workflow(
+                    workflow_id=workflow_id,
+                    user_input=query,
+                    conversation_id=f"batch-{workflow_id}-{query_index}"
+                )
+            except Exception as e:
+                return query, workflow_id, e
+        
+        try:
+            eval_result = MetricsCalculator.evaluate_response(
+                query=query,
+                workflow_id=workflow_id,
+                response=workflow_result.response,
+                sources=workflow_result.sources
+            )
+        except Exception as e:
+            return query, workflow_id, e
+        return query, workflow_id, eval_result
+    
+    tasks = [
+        asyncio.create_task(evaluate_one(i, query, workflow_id))
+        for i, query in enumerate(queries)
+        for workflow_id in workflow_ids
+    ]
+    try:
+        for next_item in asyncio.as_completed(tasks):
+            yield await next_item
+    finally:
+        # Don't leave runs in flight if the caller stops iterating early
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
 async def main():
     """Main comparison script."""
     
-    connector = LexLLMConnector()
-    
     # Test query
     query = "Hvad er Aasiaat og hvad er byens vigtigste erhverv?"
     
@@ -117,15 +216,19 @@ async def main():
     ]
     
     # Run comparison
-    results = await compare_workflows_on_query(connector, query, workflows)
+    async with LexLLMConnector() as connector:
+        results = await compare_workflows_on_query(connector, query, workflows)
     
     # Optionally save results to JSON
-    results_json = [r.model_dump() for r in results]
     with open("comparison_results.json", "w", encoding="utf-8") as f:
-        json.dump(results_json, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            f.write(orjson.dumps(
+                results, default=lambda o: o.model_dump(), option=orjson.OPT_INDENT_2
+            ).decode())
+        else:
+            json.dump(results, f, default=lambda o: o.model_dump(), indent=2, ensure_ascii=False)
     
     print(f"\n Results saved to comparison_results.json")
 
-
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""
+Shared helpers for offline LexLLMConnector tests using httpx.MockTransport.
+"""
+
+import json
+from typing import Any, AsyncIterator, Callable, Dict, List
+
+import httpx
+
+from lex_eval.connectors.lex_llm_connector import LexLLMConnector
+
+
+EVENTS: List[Dict[str, Any]] = [
+    {"event": "stream_start", "conversation_id": "conv-1", "run_id": "run-1"},
+    {"event": "workflow_step", "data": {"step": "retrieve"}},
+    {
+        "event": "sources",
+        "data": [{"id": 1, "title": "Aasiaat", "url": "https://lex.dk/Aasiaat"}],
+    },
+    {"event": "text_chunk", "data": "Aasiaat er en by "},
+    {"event": "text_chunk", "data": "i Grønland."},
+    {
+        "event": "stream_end",
+        "data": {
+            "conversation_history": [{"role": "user", "content": "Hvad er Aasiaat?"}]
+        },
+    },
+]
+
+METADATA = {
+    "workflow_id": "wf",
+    "name": "Workflow",
+    "description": "A workflow",
+    "version": "1.0",
+}
+
+
+def ndjson(events: List[Dict[str, Any]]) -> bytes:
+    return "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in events).encode(
+        "utf-8"
+    )
+
+
+class ChunkedStream(httpx.AsyncByteStream):
+    """Response body delivered in fixed-size chunks, recording whether it was read to the end."""
+
+    def __init__(self, body: bytes, chunk_size: int):
+        self.body = body
+        self.chunk_size = chunk_size
+        self.exhausted = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for i in range(0, len(self.body), self.chunk_size):
+            yield self.body[i : i + self.chunk_size]
+        self.exhausted = True
+
+
+def make_connector(
+    handler: Callable[[httpx.Request], httpx.Response], **kwargs: float
+) -> LexLLMConnector:
+    return LexLLMConnector(
+        base_url="http://lex-llm.test", transport=httpx.MockTransport(handler), **kwargs
+    )
@@ -0,0 +1,120 @@
+"""
+Offline tests for evaluate_batch using httpx.MockTransport.
+These don't need a running lex-llm instance.
+"""
+
+import asyncio
+from collections import Counter
+from typing import Any, Dict, List
+
+import httpx
+import pytest
+
+from lex_eval.connectors.lex_llm_connector import LexLLMConnector
+from lex_eval.metrics.metrics import EvaluationResult, MetricsCalculator
+from tests.compare_workflows import BatchItem, evaluate_batch
+from tests.mock_lex_llm import EVENTS, ndjson
+
+
+class FakeLexLLM:
+    """Async workflow endpoint that tracks how many runs are in flight."""
+
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self.started = 0
+        self.cancelled = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.started += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        if request.url.path == "/workflows/broken/run":
+            return httpx.Response(500, text="workflow exploded")
+        return httpx.Response(200, content=ndjson(EVENTS))
+
+    def connector(self) -> LexLLMConnector:
+        return LexLLMConnector(
+            base_url="http://lex-llm.test", transport=httpx.MockTransport(self)
+        )
+
+
+async def collect(*args: Any, **kwargs: Any) -> List[BatchItem]:
+    return [item async for item in evaluate_batch(*args, **kwargs)]
+
+
+@pytest.mark.asyncio
+async def test_evaluate_batch_yields_every_pair_once_within_concurrency_cap() -> None:
+    server = FakeLexLLM()
+    queries = [f"query {i}" for i in range(20)]
+    workflows = ["wf_a", "wf_b"]
+    async with server.connector() as connector:
+        items = await collect(connector, queries, workflows, max_concurrency=4)
+
+    assert Counter((q, w) for q, w, _ in items) == Counter(
+        (q, w) for q in queries for w in workflows
+    )
+    assert server.peak == 4
+    for query, workflow_id, result in items:
+        assert isinstance(result, EvaluationResult)
+        assert (result.query, result.workflow_id) == (query, workflow_id)
+
+
+@pytest.mark.asyncio
+async def test_evaluate_batch_yields_run_failures() -> None:
+    server = FakeLexLLM(delay=0)
+    async with server.connector() as connector:
+        items = await collect(connector, ["q1", "q2"], ["wf_a", "broken"])
+
+    failures = [(q, w, r) for q, w, r in items if isinstance(r, Exception)]
+    assert sorted((q, w) for q, w, _ in failures) == [
+        ("q1", "broken"),
+        ("q2", "broken"),
+    ]
+    assert all(isinstance(r, RuntimeError) for _, _, r in failures)
+    assert len(items) == 4
+
+
+@pytest.mark.asyncio
+async def test_evaluate_batch_yields_metrics_failures(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    evaluate_response = MetricsCalculator.evaluate_response
+
+    def flaky_evaluate(**kwargs: Any) -> EvaluationResult:
+        if kwargs["query"] == "bad":
+            raise ValueError("metrics exploded")
+        return evaluate_response(**kwargs)
+
+    monkeypatch.setattr(MetricsCalculator, "evaluate_response", flaky_evaluate)
+    server = FakeLexLLM(delay=0)
+    async with server.connector() as connector:
+        items = await collect(connector, ["good", "bad"], ["wf_a"])
+
+    results: Dict[str, Any] = {q: r for q, _, r in items}
+    assert isinstance(results["good"], EvaluationResult)
+    assert isinstance(results["bad"], ValueError)
+
+
+@pytest.mark.asyncio
+async def test_evaluate_batch_cancels_pending_runs_on_early_close() -> None:
+    server = FakeLexLLM(delay=0.05)
+    async with server.connector() as connector:
+        batch = evaluate_batch(
+            connector, [f"q{i}" for i in range(10)], ["wf_a"], max_concurrency=2
+        )
+        await batch.__anext__()
+        await batch.aclose()
+
+        # Runs still in flight were cancelled and awaited before aclose returned
+        assert server.in_flight == 0
+        assert server.cancelled >= 1
+        assert server.started < 10
@@ -0,0 +1,106 @@
+"""
+Offline tests for LexLLMConnector using httpx.MockTransport.
+These don't need a running lex-llm instance.
+"""
+
+import json
+from typing import Callable, List
+
+import httpx
+import pytest
+
+from tests.mock_lex_llm import EVENTS, METADATA, make_connector, ndjson
+
+
+@pytest.mark.asyncio
+async def test_run_workflow_sends_payload() -> None:
+    requests: List[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, content=ndjson(EVENTS))
+
+    history = [{"role": "user", "content": "Hej"}]
+    async with make_connector(handler) as connector:
+        await connector.run_workflow("wf", "Hvad er sne?", "conv-9", history)
+
+    assert requests[0].url.path == "/workflows/wf/run"
+    assert json.loads(requests[0].content) == {
+        "user_input": "Hvad er sne?",
+        "conversation_id": "conv-9",
+        "conversation_history": history,
+    }
+
+
+@pytest.mark.asyncio
+async def test_run_workflow_connection_error() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("refused", request=request)
+
+    async with make_connector(handler) as connector:
+        with pytest.raises(ConnectionError):
+            await connector.run_workflow("wf", "q", "c")
+
+
+def metadata_handler(calls: List[str]) -> Callable[[httpx.Request], httpx.Response]:
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if request.url.path == "/workflows/metadata":
+            return httpx.Response(
+                200, json=[METADATA, {**METADATA, "workflow_id": "wf2"}]
+            )
+        return httpx.Response(200, json=METADATA)
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_get_workflow_metadata_is_cached() -> None:
+    calls: List[str] = []
+    async with make_connector(metadata_handler(calls)) as connector:
+        first = await connector.get_workflow_metadata("wf")
+        second = await connector.get_workflow_metadata("wf")
+
+    assert first == second
+    assert calls == ["/workflows/wf/metadata"]
+
+
+@pytest.mark.asyncio
+async def test_get_workflow_metadata_expires_after_ttl() -> None:
+    calls: List[str] = []
+    async with make_connector(metadata_handler(calls), metadata_ttl=0.0) as connector:
+        await connector.get_workflow_metadata("wf")
+        await connector.get_workflow_metadata("wf")
+
+    assert calls == ["/workflows/wf/metadata", "/workflows/wf/metadata"]
+
+
+@pytest.mark.asyncio
+async def test_list_workflows_warms_metadata_cache() -> None:
+    calls: List[str] = []
+    async with make_connector(metadata_handler(calls)) as connector:
+        workflows = await connector.list_workflows()
+        metadata = await connector.get_workflow_metadata("wf2")
+
+    assert [wf.workflow_id for wf in workflows] == ["wf", "wf2"]
+    assert metadata.workflow_id == "wf2"
+    assert calls == ["/workflows/metadata"]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_metadata_cache() -> None:
+    calls: List[str] = []
+    async with make_connector(metadata_handler(calls)) as connector:
+        await connector.get_workflow_metadata("wf")
+        connector.invalidate_metadata_cache()
+        await connector.get_workflow_metadata("wf")
+
+    assert calls == ["/workflows/wf/metadata", "/workflows/wf/metadata"]
+
+
+@pytest.mark.asyncio
+async def test_health_check() -> None:
+    async with make_connector(lambda request: httpx.Response(200)) as connector:
+        assert await connector.health_check()
+    async with make_connector(lambda request: httpx.Response(503)) as connector:
+        assert not await connector.health_check()
@@ -0,0 +1,83 @@
+"""
+Offline tests for LexLLMConnector's NDJSON stream parsing.
+These don't need a running lex-llm instance.
+"""
+
+import json
+
+import httpx
+import pytest
+
+from tests.mock_lex_llm import EVENTS, ChunkedStream, make_connector, ndjson
+
+
+@pytest.mark.asyncio
+async def test_run_workflow_reads_body_to_end_after_stream_end() -> None:
+    # Events after stream_end are ignored, but the body must still be read
+    # fully so the connection can return to the pool
+    trailing = {"event": "text_chunk", "data": "ignored"}
+    stream = ChunkedStream(ndjson(EVENTS + [trailing]), 16)
+    async with make_connector(
+        lambda request: httpx.Response(200, stream=stream)
+    ) as connector:
+        result = await connector.run_workflow("wf", "q", "c")
+
+    assert stream.exhausted
+    assert result.response == "Aasiaat er en by i Grønland."
+
+
+@pytest.mark.asyncio
+async def test_run_workflow_error_includes_response_body() -> None:
+    async with make_connector(
+        lambda request: httpx.Response(500, text="workflow exploded")
+    ) as connector:
+        with pytest.raises(RuntimeError, match="workflow exploded"):
+            await connector.run_workflow("wf", "q", "c")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 3, 64, 100_000])
+async def test_run_workflow_parses_ndjson_across_chunk_boundaries(
+    chunk_size: int,
+) -> None:
+    # Chunk size 1 also splits the multi-byte "ø" across chunks
+    stream = ChunkedStream(ndjson(EVENTS), chunk_size)
+    async with make_connector(
+        lambda request: httpx.Response(200, stream=stream)
+    ) as connector:
+        result = await connector.run_workflow("wf", "Hvad er Aasiaat?", "conv-1")
+
+    assert result.conversation_id == "conv-1"
+    assert result.run_id == "run-1"
+    assert result.response == "Aasiaat er en by i Grønland."
+    assert [s.title for s in result.sources] == ["Aasiaat"]
+    assert [m.content for m in result.conversation_history] == ["Hvad er Aasiaat?"]
+
+
+@pytest.mark.asyncio
+async def test_run_workflow_handles_blank_lines_and_missing_trailing_newline() -> None:
+    body = b"\n" + ndjson(EVENTS[:4]) + b"\n\n" + json.dumps(EVENTS[5]).encode()
+    async with make_connector(
+        lambda request: httpx.Response(200, content=body)
+    ) as connector:
+        result = await connector.run_workflow("wf", "q", "c")
+
+    assert result.response == "Aasiaat er en by "
+    assert len(result.conversation_history) == 1
+
+
+@pytest.mark.asyncio
+async def test_run_workflow_parses_line_spanning_many_chunks() -> None:
+    sources = [
+        {"id": i, "title": f"Artikel {i}", "url": f"https://lex.dk/{i}"}
+        for i in range(5000)
+    ]
+    events = [EVENTS[0], {"event": "sources", "data": sources}, EVENTS[5]]
+    stream = ChunkedStream(ndjson(events), 4096)
+    async with make_connector(
+        lambda request: httpx.Response(200, stream=stream)
+    ) as connector:
+        result = await connector.run_workflow("wf", "q", "c")
+
+    assert len(result.sources) == 5000
+    assert result.sources[-1].title == "Artikel 4999"
@@ -0,0 +1,136 @@
+"""
+Tests for the reference-free metrics in MetricsCalculator.
+"""
+
+import random
+import re
+from typing import Any, Dict, List
+
+import pytest
+
+from lex_eval.connectors.lex_llm_connector import Source
+from lex_eval.metrics.metrics import MetricsCalculator
+
+WORDS = ["sne", "er", "ifølge", "artikel", "kilde", "Vejr", "har", "blev", "Is"]
+PUNCTUATION = [" ", " ", " ", ". ", "! ", "? ", "[", "]", "[1] "]
+
+
+def random_text(rng: random.Random) -> str:
+    return "".join(
+        rng.choice(WORDS) + rng.choice(PUNCTUATION) for _ in range(rng.randint(0, 30))
+    )
+
+
+def random_sources(rng: random.Random) -> List[Dict[str, Any]]:
+    return [
+        {"title": random_text(rng)[:40], "url": f"https://lex.dk/{i}"}
+        for i in range(rng.randint(0, 6))
+    ]
+
+
+def reference_overlap(response: str, sources: List[Dict[str, Any]]) -> float:
+    """Answer-source overlap as originally implemented."""
+    response_words = set(re.findall(r"\w+", response.lower()))
+    source_words = set()
+    for source in sources:
+        source_words.update(re.findall(r"\w+", source.get("title", "").lower()))
+    if response_words and source_words:
+        return len(response_words & source_words) / len(response_words)
+    return 0.0
+
+
+def reference_claims(response: str) -> int:
+    """Claim count as originally implemented."""
+    claim_patterns = r"\b(er|var|har|havde|blev|bliver|kan|skal|vil)\b"
+    return sum(
+        1
+        for sent in re.split(r"[.!?]+", response)
+        if re.search(claim_patterns, sent.lower())
+    )
+
+
+@pytest.mark.parametrize(
+    "response, expected",
+    [
+        ("ifølge artikel kilde", 3),
+        ("Se [1] og [2] ifølge kilde", 4),
+        # A bracketed marker is one citation, whatever words it contains
+        ("[ifølge artikel]", 1),
+        ("se [kilde: artikel 3]", 1),
+        ("[Artikel]", 1),
+        ("Ingen henvisninger her", 0),
+    ],
+)
+def test_citation_count(response: str, expected: int) -> None:
+    metrics = MetricsCalculator.calculate_answer_metrics(response, [])
+    assert metrics.citation_count == expected
+    faithfulness = MetricsCalculator.calculate_faithfulness_metrics(response, [])
+    assert faithfulness.has_citations == (expected > 0)
+
+
+def test_retrieval_metrics() -> None:
+    sources = [{"title": "Sne og is"}, {"title": "Sne"}, {"url": "no title"}]
+    metrics = MetricsCalculator.calculate_retrieval_metrics(sources)
+    assert metrics.num_sources == 3
+    assert metrics.avg_source_length == pytest.approx((9 + 3 + 0) / 3)
+    assert metrics.source_diversity == pytest.approx(3 / 4)
+
+
+def test_retrieval_metrics_without_sources() -> None:
+    metrics = MetricsCalculator.calculate_retrieval_metrics([])
+    assert (metrics.num_sources, metrics.avg_source_length) == (0, 0.0)
+    assert metrics.source_diversity == 0.0
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_metrics_match_reference_formulas(seed: int) -> None:
+    rng = random.Random(seed)
+    response = random_text(rng)
+    sources = random_sources(rng)
+
+    answer = MetricsCalculator.calculate_answer_metrics(response, sources)
+    assert answer.answer_length == len(response)
+    assert answer.answer_source_overlap == pytest.approx(
+        reference_overlap(response, sources)
+    )
+
+    faithfulness = MetricsCalculator.calculate_faithfulness_metrics(response, sources)
+    assert faithfulness.claims_count == reference_claims(response)
+    assert faithfulness.has_citations == bool(
+        re.search(r"\[.*?\]|ifølge|artikel|kilde", response.lower())
+    )
+
+    titles = [s.get("title", "") for s in sources]
+    words = re.findall(r"\w+", " ".join(titles).lower())
+    retrieval = MetricsCalculator.calculate_retrieval_metrics(sources)
+    assert retrieval.num_sources == len(sources)
+    if sources:
+        assert retrieval.avg_source_length == pytest.approx(
+            sum(map(len, titles)) / len(sources)
+        )
+        assert retrieval.source_diversity == pytest.approx(
+            len(set(words)) / len(words) if words else 0.0
+        )
+
+
+@pytest.mark.parametrize("seed", range(50))
+@pytest.mark.parametrize("as_models", [False, True])
+def test_calculate_methods_agree_with_evaluate_response(
+    seed: int, as_models: bool
+) -> None:
+    rng = random.Random(seed)
+    response = random_text(rng)
+    dicts = [{"id": i, **s} for i, s in enumerate(random_sources(rng))]
+    sources: List[Any] = [Source(**s) for s in dicts] if as_models else dicts
+
+    result = MetricsCalculator.evaluate_response(
+        query="q", workflow_id="wf", response=response, sources=sources
+    )
+    assert result.retrieval == MetricsCalculator.calculate_retrieval_metrics(sources)
+    assert result.answer == MetricsCalculator.calculate_answer_metrics(
+        response, sources
+    )
+    assert result.faithfulness == MetricsCalculator.calculate_faithfulness_metrics(
+        response, sources
+    )
+    assert result.sources == dicts